@@ -1,4 +1,9 @@
-from .basic_entities import Component, Node, Property, Terminal
+from .abstract import FrozenEntityError
+from .basic_entities import Component, Node, Property, Terminal, property_overlay
 from .container_entities import Model, ModelPartition
 from .model_deserializer import JSONDeserializer
 from .model_deserializer import ModelDeserializationError
+from .model_deserializer import ConversionAbortedError
+from .shared_model import attach_partition, flatten_partition, restore_partition, share_partition
+from .memory_report import memory_footprint
+from .monitor import ConversionMonitor
@@ -1,4 +1,122 @@
-class Parentable:
+from types import MappingProxyType
+
+
+class FrozenEntityError(Exception):
+    """
+    Raised when a frozen (read-only) entity is modified.
+    """
+
+    def __init__(self, entity, operation):
+        super().__init__("Can't {0} on frozen {1}".format(operation, type(entity).__name__))
+        self.entity = entity
+        self.operation = operation
+
+
+class Freezable:
+    """ Models entities which can be turned into read-only ones. """
+    _frozen = False
+
+    @property
+    def frozen(self):
+        return self._frozen
+
+    def freeze(self):
+        """
+        Make this entity (and entities it contains) read-only.
+        Containers are replaced with immutable, precomputed views which
+        are safe to share between threads, NumPy array values are made
+        non-writable.
+
+        The entity becomes instance of a read-only subclass of its class,
+        so check its type with isinstance(). Frozen entities can be
+        pickled and copied, the copies are frozen too.
+
+        Returns:
+            None
+        """
+        if self._frozen:
+            return
+
+        self._freeze_views()
+        self._lock_values()
+        # Switching to a read-only subclass keeps attribute assignment on
+        # mutable entities free of any checks.
+        self.__class__ = _frozen_class(type(self))
+
+    def _freeze_views(self):
+        """ Replace internal containers with immutable ones. """
+
+    def _lock_values(self):
+        """ Make mutable values held by this entity read-only. """
+
+    def _check_mutable(self, operation):
+        if self._frozen:
+            raise FrozenEntityError(self, operation)
+
+    def _set_frozen_attr(self, name, value):
+        """ Handle attribute assignment on frozen entity. """
+        raise FrozenEntityError(self, "set '{0}'".format(name))
+
+
+def _frozen_setattr(self, name, value):
+    self._set_frozen_attr(name, value)
+
+
+def _frozen_delattr(self, name):
+    raise FrozenEntityError(self, "delete '{0}'".format(name))
+
+
+def _frozen_reduce_ex(self, protocol):
+    # Views aren't picklable, they are stored as dicts and restored in
+    # _frozen_setstate().
+    state = {}
+    views = []
+    for name, value in self.__dict__.items():
+        if isinstance(value, MappingProxyType):
+            value = dict(value)
+            views.append(name)
+        state[name] = value
+
+    return _new_frozen, (self._unfrozen_cls,), (state, views)
+
+
+def _frozen_setstate(self, state):
+    state, views = state
+    for name in views:
+        state[name] = MappingProxyType(state[name])
+    self.__dict__.update(state)
+    self._lock_values()
+
+
+def _new_frozen(cls):
+    """ Create uninitialized frozen entity of the provided class. """
+    entity = cls.__new__(cls)
+    entity.__class__ = _frozen_class(cls)
+    return entity
+
+
+_frozen_classes = {}
+
+
+def _frozen_class(cls):
+    """ Return read-only subclass of the provided entity class. """
+    try:
+        return _frozen_classes[cls]
+    except KeyError:
+        frozen_cls = type(cls.__name__, (cls,), {
+            "__module__": cls.__module__,
+            "__qualname__": cls.__qualname__,
+            "__setattr__": _frozen_setattr,
+            "__delattr__": _frozen_delattr,
+            "__reduce_ex__": _frozen_reduce_ex,
+            "__setstate__": _frozen_setstate,
+            "_unfrozen_cls": cls,
+            "_frozen": True,
+        })
+        return _frozen_classes.setdefault(cls, frozen_cls)
+
+
+class Parentable(Freezable):
     """ Models entities which have parent. """
     def __init__(self, parent, *args, **kwargs) -> None:
         """ Initialize an object. """
@@ -7,7 +125,7 @@ class Parentable:
         self.parent = parent
 
 
-class Nameable:
+class Nameable(Freezable):
     """ Models entities which have name. """
     def __init__(self, name, *args, **kwargs) -> None:
         """ Initialize an object. """
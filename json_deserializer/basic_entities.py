@@ -1,3 +1,10 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import MappingProxyType
+import threading
+
+import numpy as np
+
 from .abstract import Parentable, Nameable
 from .constants import KIND_PE
 
@@ -7,20 +14,25 @@ class Node(Parentable, Nameable):
     Models a node, which is a logical entity which encompasses
     all terminals which are directly connected.
     """
-    def __init__(self, parent, name=None, terminals=None):
+    def __init__(self, parent, name=None, terminals=None, boundary=False):
         """
         Initialize node.
 
         Args:
             parent(object): Parent of this object.
             terminals(iterable): Collection of terminals.
+            boundary(bool): Indicate if node is connected to terminals
+                which were left out of an extracted subsystem.
         """
         super().__init__(parent=parent, name=name)
         self._terminals = set()
         self.terminals = terminals
+        self.boundary = boundary
 
     @property
     def terminals(self):
+        if self._frozen:
+            return self._terminals
         return {t for t in self._terminals}
 
     @terminals.setter
@@ -41,6 +53,7 @@ class Node(Parentable, Nameable):
         Returns:
             None
         """
+        self._check_mutable("add terminal")
         self._terminals.add(terminal)
         terminal.node = self
 
@@ -90,8 +103,13 @@ class Node(Parentable, Nameable):
         Returns:
             None
         """
+        self._check_mutable("remove terminal")
         self._terminals.remove(terminal)
 
+    def _freeze_views(self):
+        super()._freeze_views()
+        self._terminals = frozenset(self._terminals)
+
 
 class Terminal(Parentable, Nameable):
     """ Models component terminal. """
@@ -110,6 +128,10 @@ class Terminal(Parentable, Nameable):
         self.kind = kind
         self.node = node
 
+    def copy(self):
+        """ Return a copy of this terminal, not connected to any node. """
+        return Terminal(parent=None, name=self.name, kind=self.kind)
+
     @property
     def fqn(self):
         if self.parent and hasattr(self.parent, "fqn"):
@@ -118,9 +140,97 @@ class Terminal(Parentable, Nameable):
             return self.name
 
 
+# Property values overridden in the current context, see property_overlay().
+_property_overlay = ContextVar("property_overlay", default=None)
+
+# Number of overlays active in all threads, reads of property values are
+# routed through overlays only while there is any.
+_active_overlays = 0
+_active_overlays_lock = threading.Lock()
+
+
+@contextmanager
+def property_overlay(values):
+    """
+    Override values of properties within the ``with`` block, without
+    changing the properties themselves (copy-on-write). Values assigned
+    to any property inside the block are kept in the overlay too, so
+    models (even frozen ones) can be shared between overlays.
+    Overlays are local to the current thread (context), nested overlays
+    extend outer ones.
+
+    Args:
+        values(dict): Maps Property objects to their values.
+    """
+    outer = _property_overlay.get()
+    overlay = dict(outer) if outer is not None else {}
+    overlay.update(values)
+
+    _count_overlay(1)
+    token = _property_overlay.set(overlay)
+    try:
+        yield overlay
+    finally:
+        _property_overlay.reset(token)
+        _count_overlay(-1)
+
+
+def _count_overlay(delta):
+    global _active_overlays
+    with _active_overlays_lock:
+        _active_overlays += delta
+        # Values of properties are plain instance attributes unless some
+        # overlay is active, so reading them costs nothing extra otherwise.
+        Property.value = _OVERLAID_VALUE if _active_overlays else _DECODED_VALUE
+
+
+class _DecodedValue:
+    """
+    Descriptor of ``Property.value`` which decodes lazily loaded values.
+    Decoded values are stored in the instance dict, which takes precedence
+    over this (non-data) descriptor.
+    """
+
+    def __get__(self, prop, owner=None):
+        if prop is None:
+            return self
+        return prop._decode()
+
+
+class _OverlaidValue(_DecodedValue):
+    """ Descriptor of ``Property.value`` used while any overlay is active. """
+
+    def __get__(self, prop, owner=None):
+        if prop is None:
+            return self
+
+        overlay = _property_overlay.get()
+        if overlay is not None and prop in overlay:
+            return overlay[prop]
+        try:
+            return prop.__dict__["value"]
+        except KeyError:
+            return prop._decode()
+
+    def __set__(self, prop, value):
+        overlay = _property_overlay.get()
+        if overlay is not None:
+            overlay[prop] = value
+        else:
+            prop.__dict__["value"] = value
+
+
+_DECODED_VALUE = _DecodedValue()
+_OVERLAID_VALUE = _OverlaidValue()
+
+
 class Property(Parentable, Nameable):
     """ Models a property (on component or mask). """
-    def __init__(self, parent, name, value):
+    _decode_lock = threading.Lock()
+
+    value = _DECODED_VALUE
+
+    def __init__(self, parent, name, value, decoder=None):
         """
         Initialize a property.
 
@@ -128,10 +238,82 @@ class Property(Parentable, Nameable):
             parent(object): Parent of this object.
             name(str): Property name.
             value(object): Property value.
+            decoder(callable): If provided, ``value`` is a raw value which is
+                converted with ``decoder`` on first access and cached.
         """
         super().__init__(parent=parent, name=name)
 
-        self.value = value
+        if decoder is None:
+            if _active_overlays:
+                # Initial value doesn't belong to the active overlay.
+                self.__dict__["value"] = value
+            else:
+                self.value = value
+        else:
+            self._raw_value = value
+            self._decoder = decoder
+
+    def _decode(self):
+        with self._decode_lock:
+            state = self.__dict__
+            if "value" not in state:
+                # Cache bypasses frozen entity checks, the value itself
+                # doesn't change.
+                value = self._decoder(state.pop("_raw_value"))
+                if self._frozen:
+                    value = _lock_value(value)
+                state["value"] = value
+                del state["_decoder"]
+            return state["value"]
+
+    def _lock_values(self):
+        super()._lock_values()
+        # Also runs on already frozen (unpickled) properties.
+        state = self.__dict__
+        if "value" in state:
+            state["value"] = _lock_value(state["value"])
+
+    def _set_frozen_attr(self, name, value):
+        overlay = _property_overlay.get()
+        if name == "value" and overlay is not None:
+            overlay[self] = value
+        else:
+            super()._set_frozen_attr(name, value)
+
+    def copy(self):
+        """ Return a copy of this property, sharing (not yet decoded) value. """
+        value, decoder = self.raw_state()
+        return Property(parent=None, name=self.name, value=value, decoder=decoder)
+
+    def raw_state(self):
+        """
+        Return stored value and decoder (None once the value is decoded),
+        without decoding the value or consulting overlays.
+
+        Returns:
+            tuple (value, decoder)
+        """
+        with self._decode_lock:
+            state = self.__dict__
+            if "value" in state:
+                return state["value"], None
+            return state["_raw_value"], state["_decoder"]
+
+
+def _lock_value(value):
+    """
+    Return the value with NumPy arrays in it (or in its items) replaced
+    by non-writable views. Arrays themselves are left as they are, as
+    they may be shared with properties which aren't frozen.
+    """
+    if isinstance(value, np.ndarray):
+        value = value.view()
+        value.flags.writeable = False
+    elif isinstance(value, (list, tuple)):
+        items = [_lock_value(item) for item in value]
+        if any(new is not old for new, old in zip(items, value)):
+            value = items if isinstance(value, list) else tuple(items)
+    return value
 
 
 class PropertyContainer(Parentable):
@@ -154,6 +336,8 @@ class PropertyContainer(Parentable):
     @property
     def properties(self):
         """ Return view to properties in dict form. """
+        if self._frozen:
+            return self._properties_view
         return {p.name: p for p in self._prop_set}
 
     def add_property(self, prop):
@@ -166,6 +350,7 @@ class PropertyContainer(Parentable):
         Returns:
             None
         """
+        self._check_mutable("add property")
         prop.parent = self
         self._prop_set.add(prop)
 
@@ -195,6 +380,7 @@ class PropertyContainer(Parentable):
         Returns:
             None
         """
+        self._check_mutable("remove property")
         self._prop_set.remove(prop)
 
     def remove_properties(self, props):
@@ -202,6 +388,13 @@ class PropertyContainer(Parentable):
         for prop in props:
             self.remove_property(prop)
 
+    def _freeze_views(self):
+        super()._freeze_views()
+        for prop in self._prop_set:
+            prop.freeze()
+        self._prop_set = frozenset(self._prop_set)
+        self._properties_view = MappingProxyType({p.name: p for p in self._prop_set})
+
 
 class Component(Nameable, PropertyContainer):
     """ Models a component. """
@@ -233,6 +426,39 @@ class Component(Nameable, PropertyContainer):
     def __str__(self):
         return "Component '{0}'".format(self.fqn)
 
+    @property
+    def parent_comp(self):
+        return self._parent_comp
+
+    @parent_comp.setter
+    def parent_comp(self, parent_comp):
+        old_parent_comp = self.__dict__.get("_parent_comp")
+        self._parent_comp = parent_comp
+        # Partition indexes its components by their parent components.
+        move_child = getattr(self.parent, "_move_child", None)
+        if move_child is not None:
+            move_child(self, old_parent_comp)
+
+    def copy(self, parent_comp=None, terminals=True):
+        """
+        Return a copy of this component. Property values are shared with
+        the original properties, terminals are not connected to any node.
+
+        Args:
+            parent_comp(Component): Parent component of the copy.
+            terminals(bool): Copy terminals too.
+
+        Returns:
+            Component
+        """
+        return Component(parent=None,
+                         name=self.name,
+                         comp_type=self.comp_type,
+                         composite=self.composite,
+                         properties=[prop.copy() for prop in self._prop_set],
+                         terminals=[term.copy() for term in self._terminals] if terminals else None,
+                         parent_comp=parent_comp)
+
     @property
     def atomic(self):
         return not self.composite
@@ -252,6 +478,7 @@ class Component(Nameable, PropertyContainer):
             return ""
 
     def add_terminal(self, terminal):
+        self._check_mutable("add terminal")
         terminal.parent = self
         self._terminals.add(terminal)
 
@@ -262,4 +489,13 @@ class Component(Nameable, PropertyContainer):
     @property
     def terminals(self):
         """ Returns a view to terminals in dict form. """
+        if self._frozen:
+            return self._terminals_view
         return {t.name: t for t in self._terminals}
+
+    def _freeze_views(self):
+        super()._freeze_views()
+        for term in self._terminals:
+            term.freeze()
+        self._terminals = frozenset(self._terminals)
+        self._terminals_view = MappingProxyType({t.name: t for t in self._terminals})
@@ -30,3 +30,10 @@ COMPONENT_TYPES = [SRC_CURRENT, SRC_VOLTAGE, MSR_CURRENT, MSR_VOLTAGE, PAS_RESIS
 
 switch_term_map = {SW_IN: P_NODE,
                    SW_OUT: N_NODE}
+
+# conversion stages reported to ConversionMonitor
+STAGE_READ = "read"
+STAGE_DECODE = "decode"
+STAGE_RESOLVE = "resolve"
+STAGE_CONVERT = "convert"
+STAGE_GENERATE = "generate"
@@ -1,5 +1,8 @@
 # from json_deserializer import Component
+from types import MappingProxyType
+
 from .abstract import Parentable, Nameable
+from .basic_entities import Component, Node
 
 
 class ModelPartition(Parentable, Nameable):
@@ -16,6 +19,9 @@ class ModelPartition(Parentable, Nameable):
         self._comp_dict = {}
         self._par_comp_dict = {}
         self._node_set = set()
+        # Parent component -> {child component: whether it's a parent component},
+        # kept up to date by Component.parent_comp setter.
+        self._children = {}
 
         if parent_components:
             self.add_parent_components(parent_components)
@@ -27,23 +33,35 @@ class ModelPartition(Parentable, Nameable):
             self.add_nodes(nodes)
 
     def add_component(self, component):
+        self._check_mutable("add component")
         component.parent = self
         self._comp_dict[component.fqn] = component
+        self._children.setdefault(component.parent_comp, {})[component] = False
 
     def add_components(self, components):
         for comp in components:
             self.add_component(comp)
 
     def add_parent_component(self, parent_component):
+        self._check_mutable("add parent component")
         parent_component.parent = self
         self._par_comp_dict[parent_component.fqn] = parent_component
+        self._children.setdefault(parent_component.parent_comp, {})[parent_component] = True
 
     def add_parent_components(self, parent_components):
         for comp in parent_components:
             self.add_parent_component(comp)
 
     def remove_component_by_fqn(self, component_fqn):
-        del self._comp_dict[component_fqn]
+        self._check_mutable("remove component")
+        component = self._comp_dict.pop(component_fqn)
+        self._children.get(component.parent_comp, {}).pop(component, None)
+
+    def _move_child(self, component, old_parent_comp):
+        """ Reindex the component after its parent component was changed. """
+        siblings = self._children.get(old_parent_comp)
+        if siblings is not None and component in siblings:
+            self._children.setdefault(component.parent_comp, {})[component] = siblings.pop(component)
 
     @property
     def components(self):
@@ -61,7 +79,97 @@ class ModelPartition(Parentable, Nameable):
         return (component for component in self.components
                 if component.comp_type == comp_type)
 
+    def extract_subsystem(self, parent_fqn=None, components=None, name=None):
+        """
+        Make a standalone partition out of a part of this one, selected
+        either by FQN of a parent component (the subsystem with everything
+        under it) or by a collection of components.
+
+        Selected components are copied together with their terminals and
+        nodes they are connected to; the original partition is not
+        changed. Nodes which are also connected to terminals of components
+        left out are marked as ``boundary``. Parent components above the
+        selection are copied without terminals, so FQNs stay the same.
+
+        Args:
+            parent_fqn(str): FQN of the parent component to extract.
+            components(iterable): Components (or their FQNs) to extract.
+            name(str): Name of the new partition, defaults to this one's.
+
+        Raises:
+            KeyError exception if a selected component is not present
+            in this partition, ValueError exception if nothing is selected.
+
+        Returns:
+            ModelPartition
+        """
+        if parent_fqn is None and components is None:
+            raise ValueError("Either parent_fqn or components has to be provided.")
+
+        # Selected components mapped to whether they are parent components,
+        # found through the children index, so the cost follows the size
+        # of the selection.
+        selected = {}
+        if parent_fqn is not None:
+            subsystems = [self._par_comp_dict[parent_fqn]]
+            selected[subsystems[0]] = True
+            while subsystems:
+                children = self._children.get(subsystems.pop(), {})
+                selected.update(children)
+                subsystems.extend(children)
+        if components is not None:
+            for comp in components:
+                if isinstance(comp, str):
+                    comp = self._comp_dict.get(comp) or self._par_comp_dict[comp]
+                try:
+                    selected[comp] = self._children[comp.parent_comp][comp]
+                except KeyError:
+                    raise KeyError(comp.fqn) from None
+
+        copies = {}
+
+        def copy_component(comp):
+            if comp not in copies:
+                parent_comp = comp.parent_comp
+                if isinstance(parent_comp, Component):
+                    parent_comp = copy_component(parent_comp)
+                copies[comp] = comp.copy(parent_comp=parent_comp, terminals=False)
+            return copies[comp]
+
+        new_components = []
+        new_parent_components = []
+        node_copies = {}
+        for comp, is_parent_component in selected.items():
+            new_comp = copy_component(comp)
+            if is_parent_component:
+                new_parent_components.append(new_comp)
+            else:
+                new_components.append(new_comp)
+
+            for term in comp.terminals.values():
+                new_term = term.copy()
+                new_comp.add_terminal(new_term)
+                if term.node is None:
+                    continue
+                if term.node not in node_copies:
+                    node_copies[term.node] = Node(parent=None, name=term.node.name)
+                node_copies[term.node].add_terminal(new_term)
+
+        for node, new_node in node_copies.items():
+            new_node.boundary = len(new_node._terminals) < len(node._terminals)
+
+        # Ancestors of the selection are kept as parent components.
+        new_parent_components.extend(copy for comp, copy in copies.items() if comp not in selected)
+
+        return ModelPartition(
+            parent=None,
+            name=name if name is not None else self.name,
+            parent_components=new_parent_components,
+            components=new_components,
+            nodes=node_copies.values())
+
     def add_node(self, node):
+        self._check_mutable("add node")
         self._node_set.add(node)
         node.parent = self
 
@@ -71,6 +179,8 @@ class ModelPartition(Parentable, Nameable):
 
     @property
     def nodes(self):
+        if self._frozen:
+            return self._node_set
         return {n for n in self._node_set}
 
     def insert_component_parallel(self, new_comp, existing_comp):
@@ -90,6 +200,7 @@ class ModelPartition(Parentable, Nameable):
         Returns:
             None
         """
+        self._check_mutable("insert component")
         self.add_component(new_comp)
 
         new_term_p = new_comp.terminals["p_node"]
@@ -133,6 +244,7 @@ class ModelPartition(Parentable, Nameable):
         Returns:
             None
         """
+        self._check_mutable("insert component")
         self.add_component(new_comp)
 
         new_term_p = new_comp.terminals["p_node"]
@@ -165,6 +277,8 @@ class ModelPartition(Parentable, Nameable):
             - adds the terminals of new component to the nodes
 
         """
+        self._check_mutable("replace component")
+
         # Get the existing nodes for p and n ports
         existing_p_node = old_comp.terminals["p_node"].node
         existing_n_node = old_comp.terminals["n_node"].node
@@ -178,7 +292,7 @@ class ModelPartition(Parentable, Nameable):
             old_term.node = None
 
         # Remove old component
-        del self._comp_dict[old_comp.fqn]  # remove old component from components
+        self.remove_component_by_fqn(old_comp.fqn)  # remove old component from components
 
         # Add the new component
         self.add_component(new_comp)
@@ -209,6 +323,7 @@ class ModelPartition(Parentable, Nameable):
             comp(Component): component whose terminals are removed.
         Returns:
         """
+        self._check_mutable("unwire component")
         p_node = comp.terminals["p_node"].node
         p_node.remove_terminal(comp.terminals["p_node"])
         n_node = comp.terminals["n_node"].node
@@ -228,6 +343,7 @@ class ModelPartition(Parentable, Nameable):
                                 comp_type - connecting component's type (string)
                                 node_type - connecting component's terminal type: "p_node" or "n_node" (string)
         """
+        self._check_mutable("unwire component")
 
         terminals = {"p_node": None, "n_node": None}
         terminal_types = terminals.keys()
@@ -260,8 +376,17 @@ class ModelPartition(Parentable, Nameable):
         Args:
             node(object): Node to be removed
         """
+        self._check_mutable("remove node")
         self._node_set.remove(node)
 
+    def _freeze_views(self):
+        super()._freeze_views()
+        for entity in (*self._comp_dict.values(), *self._par_comp_dict.values(), *self._node_set):
+            entity.freeze()
+        self._comp_dict = MappingProxyType(self._comp_dict)
+        self._par_comp_dict = MappingProxyType(self._par_comp_dict)
+        self._node_set = frozenset(self._node_set)
+
 
 class Model(Nameable):
     """ Models a top level container. """
@@ -282,6 +407,7 @@ class Model(Nameable):
             self.add_model_partitions(model_partitions)
 
     def add_model_partition(self, model_partition):
+        self._check_mutable("add model partition")
         self._model_partitions.add(model_partition)
         model_partition.parent = self
 
@@ -291,4 +417,14 @@ class Model(Nameable):
 
     @property
     def model_partitions(self):
+        if self._frozen:
+            return self._model_partitions_view
         return {model_part.name: model_part for model_part in self._model_partitions}
+
+    def _freeze_views(self):
+        super()._freeze_views()
+        for model_part in self._model_partitions:
+            model_part.freeze()
+        self._model_partitions = frozenset(self._model_partitions)
+        self._model_partitions_view = MappingProxyType(
+            {model_part.name: model_part for model_part in self._model_partitions})
@@ -0,0 +1,117 @@
+from types import MappingProxyType
+import heapq
+import sys
+
+import numpy as np
+
+from ..json_deserializer import Model
+from .abstract import Freezable
+
+
+def memory_footprint(model, top_n=10):
+    """
+    Account memory used by a deserialized model in a single pass over
+    its graph.
+
+    Every object is counted once; objects shared between entities
+    (e.g. interned strings) are attributed to the first entity visited.
+    Sizes of components include their properties and terminals.
+
+    Args:
+        model(Model or ModelPartition): Model to inspect.
+        top_n(int): Number of heaviest components to report.
+    Returns:
+        dict with keys:
+            total_bytes - deep size of the whole graph (int)
+            by_entity_class - {class name: {"count": int, "bytes": int}}
+            by_comp_type - {component type: {"count": int, "bytes": int}}
+            by_property - {property name: {"count": int, "bytes": int}}
+            top_components - list of {"fqn": str, "comp_type": str, "bytes": int}
+                sorted from the heaviest one
+    """
+    seen = set()
+    by_entity_class = {}
+    by_comp_type = {}
+    by_property = {}
+    component_sizes = []
+
+    def account(entity):
+        size = sys.getsizeof(entity)
+        seen.add(id(entity))
+        size += _deep_size(vars(entity), seen)
+        _add_to(by_entity_class, type(entity).__name__, size)
+        return size
+
+    total = 0
+    if isinstance(model, Model):
+        total += account(model)
+        model_partitions = model.model_partitions.values()
+    else:
+        model_partitions = [model]
+
+    for model_part in model_partitions:
+        total += account(model_part)
+
+        for comp in (*model_part.parent_components, *model_part.components):
+            comp_size = account(comp)
+            for prop in comp.properties.values():
+                prop_size = account(prop)
+                _add_to(by_property, prop.name, prop_size)
+                comp_size += prop_size
+            for term in comp.terminals.values():
+                comp_size += account(term)
+
+            _add_to(by_comp_type, comp.comp_type, comp_size)
+            component_sizes.append((comp_size, comp.fqn, comp.comp_type))
+            total += comp_size
+
+        for node in model_part.nodes:
+            total += account(node)
+
+    top_components = [{"fqn": fqn, "comp_type": comp_type, "bytes": size}
+                      for size, fqn, comp_type in heapq.nlargest(top_n, component_sizes)]
+
+    return {
+        "total_bytes": total,
+        "by_entity_class": by_entity_class,
+        "by_comp_type": by_comp_type,
+        "by_property": by_property,
+        "top_components": top_components,
+    }
+
+
+def _add_to(breakdown, key, size):
+    entry = breakdown.get(key)
+    if entry is None:
+        entry = breakdown[key] = {"count": 0, "bytes": 0}
+    entry["count"] += 1
+    entry["bytes"] += size
+
+
+def _deep_size(obj, seen):
+    """
+    Return deep size of the object, not following references to
+    other model entities (they are accounted on their own).
+    """
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, Freezable):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+
+        if isinstance(obj, (dict, MappingProxyType)):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif isinstance(obj, np.ndarray):
+            # getsizeof() includes the data buffer only for arrays owning it.
+            if obj.base is not None:
+                stack.append(obj.base)
+            if obj.dtype == object:
+                stack.extend(obj.flat)
+
+    return size
@@ -1,47 +1,124 @@
 from types import TracebackType
 from ..json_deserializer import Node, Terminal, Property, Component, Model, ModelPartition
+from .constants import STAGE_READ, STAGE_DECODE, STAGE_RESOLVE
 import numpy as np
 import itertools as it
 import functools as fn
 import json
+import gzip
+import lzma
+import os
+import re
+
+# Magic bytes of supported compressed inputs mapped to the opener used to
+# stream-decompress them.
+COMPRESSION_MAGIC = {
+    b"\x1f\x8b": gzip.open,
+    b"\xfd7zXZ\x00": lzma.open,
+}
+
+# Number of characters read (and decompressed) from the input at a time.
+READ_CHUNK_SIZE = 1 << 20
+
+# Numeric payload of an ndarray value, which lazy loading turns into a
+# JSON string instead of letting it be parsed into lists of floats.
+# Payloads shorter than DEFERRED_PAYLOAD_MIN_SIZE are cheaper to decode
+# right away.
+DEFERRED_PAYLOAD_MIN_SIZE = 256
+_ARRAY_PAYLOAD_RE = re.compile(
+    rb'(\{\s*"_cls"\s*:\s*"ndarray"\s*,\s*)"value"(\s*:\s*)'
+    rb'(\[[-+.,eE0-9\[\]\sNaInfity]{%d,}\])' % (DEFERRED_PAYLOAD_MIN_SIZE - 2))
 
 
 class JSONDeserializer:
     """ Deserializer for JSON file exported from Typhoon Schematic Editor"""
 
-    def __init__(self, json_file_path: str):
+    def __init__(self, json_file_path: str, lazy_values=False, monitor=None):
         """
             Initialize an object.
             :param json_file_path: Path to model that contains Model description.
+            :param lazy_values: Don't parse numeric NumPy array values while
+                loading, keep them as compact JSON strings and build arrays
+                on first access. Pays off for models with large array values
+                of which only few are read.
+            :param monitor: ConversionMonitor which gets progress of reading and
+                decoding, and which may abort them.
         """
 
         self.file_path = json_file_path
+        self.lazy_values = lazy_values
+        self.monitor = monitor
         self.obj_bytes = None
 
     def load_bytes_from_file(self):
         """
-            Loads bytes from .json file
+            Loads bytes from .json file. Gzip and xz compressed files are
+            detected by their magic bytes and decompressed chunk by chunk.
             :return: None
         """
 
         try:
-            with open(self.file_path, "r") as handle:
-                content = handle.read()
-                self.obj_bytes = content.encode("utf-8")
+            opener = self._detect_opener()
+            # Size of compressed input doesn't tell the size of its content.
+            total = os.path.getsize(self.file_path) if opener is open else None
+            content = bytearray()
+            with opener(self.file_path, "rt") as handle:
+                for chunk in iter(fn.partial(handle.read, READ_CHUNK_SIZE), ""):
+                    content += chunk.encode("utf-8")
+                    if self.monitor is not None:
+                        self.monitor.report(STAGE_READ, len(content), total)
+            self.obj_bytes = bytes(content)
+        except ModelDeserializationError:
+            raise
         except:
             raise ModelDeserializationError(ModelDeserializationError.CANT_READ_FROM_MDL_FILE,
                                             file_path=self.file_path)
 
-    def get_model(self):
+    def _detect_opener(self):
+        """
+            Pick the file opener based on the magic bytes of the input, so
+            gzip and xz compressed exports are decompressed while reading.
+            :return: Callable with the same signature as open()
+        """
+
+        with open(self.file_path, "rb") as handle:
+            header = handle.read(max(len(magic) for magic in COMPRESSION_MAGIC))
+
+        for magic, opener in COMPRESSION_MAGIC.items():
+            if header.startswith(magic):
+                return opener
+
+        return open
+
+    def get_model(self, workers=1):
         """
             Reconstruct model graph from JSON bytes.
+            :param workers: Number of processes used to decode components and
+                nodes of partitions in parallel (None means CPU count). The
+                resulting model is the same as the one of serial decoding.
+                Only pays off with several free cores, see get_model_parallel.
             :return: Model
         """
-        obj_hook = fn.partial(json_obj_hook, terminal_ids={}, component_ids={})
+        obj_hook = fn.partial(json_obj_hook, terminal_ids={}, component_ids={},
+                              lazy_values=self.lazy_values, monitor=self.monitor)
 
         try:
+            if self.lazy_values:
+                # Rewritten document decodes to the same model, so it replaces
+                # the original one instead of doubling the memory held.
+                self.obj_bytes = defer_array_payloads(self.obj_bytes)
+
+            if workers != 1:
+                from .parallel_parser import get_model_parallel
+                model = get_model_parallel(self.obj_bytes, workers=workers,
+                                           lazy_values=self.lazy_values, monitor=self.monitor)
+                if model is not None:
+                    return model
+
             model = json.loads(self.obj_bytes, object_hook=obj_hook)
             return model
+        except ModelDeserializationError:
+            raise
         except:
             raise ModelDeserializationError(ModelDeserializationError.CANT_DESERIALIZE_DATA)
 
@@ -68,7 +145,37 @@ class ModelDeserializationError(Exception):
         return error_string
 
 
-def json_obj_hook(obj: dict, terminal_ids={}, component_ids={}):
+class ConversionAbortedError(ModelDeserializationError):
+    """
+    Raised when conversion is stopped by its ConversionMonitor.
+    """
+
+    CONVERSION_CANCELLED = "Conversion cancelled."
+    TIME_BUDGET_EXCEEDED = "Conversion time budget exceeded."
+    MEMORY_BUDGET_EXCEEDED = "Conversion memory budget exceeded."
+
+    def __init__(self, error_type, stage=None, detail=None):
+        super().__init__(error_type)
+        self.stage = stage
+        self.detail = detail
+
+    @property
+    def error_string(self):
+        error_string = self.error_type
+        if self.detail:
+            error_string += " Budget: {0}.".format(self.detail)
+        if self.stage:
+            error_string += " Stage: {0}.".format(self.stage)
+
+        return error_string
+
+
+NP_INT_CLASSES = {"int8", "int16", "int32", "int64", "uint8", "uint16",
+                  "uint32", "uint64"}
+VALUE_CLASSES = {"set", "ndarray", "complex", "range"} | NP_INT_CLASSES
+
+
+def json_obj_hook(obj: dict, terminal_ids={}, component_ids={}, lazy_values=False, monitor=None):
     """
     Function used to help JSON loads() to make correct types of objects.
 
@@ -76,17 +183,21 @@ def json_obj_hook(obj: dict, terminal_ids={}, component_ids={}):
         obj(dict): Dict object provided by json loads() function.
         terminal_ids(dict): Memo for terminal ids.
         component_ids(dict): Memo for component ids.
+        lazy_values(bool): Leave arrays with payloads deferred by
+            ``defer_array_payloads`` in their JSON form and let properties
+            decode them on first access.
+        monitor(ConversionMonitor): Gets count of decoded objects and
+            progress of id resolution.
     Returns:
         Concrete object based on provided dictionary.
     """
     if obj and "_cls" in obj:
         obj_cls = obj["_cls"]
+        if monitor is not None:
+            monitor.count(STAGE_DECODE)
 
         if obj_cls == "Property":
-            return Property(
-                parent=None,
-                name=obj["name"],
-                value=obj["value"])
+            return new_property(obj["name"], obj["value"], lazy_values)
         elif obj_cls == "Component":
             # Add mask properties
             all_properties = obj["properties"]
@@ -114,13 +225,20 @@ def json_obj_hook(obj: dict, terminal_ids={}, component_ids={}):
 
             # Resolve nodes terminals
             for model_part in obj["dev_partitions"]:
-                for node in model_part.nodes:
+                nodes = model_part.nodes
+                for node_idx, node in enumerate(nodes):
+                    if monitor is not None and node_idx % monitor.report_interval == 0:
+                        monitor.report(STAGE_RESOLVE, node_idx, len(nodes))
+
                     term_ids = node.terminals
                     node.terminals = set()
 
                     terms = (terminal_ids[term_id] for term_id in term_ids)
                     node.add_terminals(terms)
 
+                if monitor is not None:
+                    monitor.report(STAGE_RESOLVE, len(nodes), len(nodes))
+
             return Model(name=obj["name"],
                          model_partitions=obj["dev_partitions"])
 
@@ -151,23 +269,114 @@ def json_obj_hook(obj: dict, terminal_ids={}, component_ids={}):
             node._terminals = terminal_ids
 
             return node
-        elif obj_cls == "set":
-            return set(obj["value"])
-        elif obj_cls == "ndarray":
-            return np.array(obj["value"])
-        elif obj_cls in {"int8", "int16", "int32", "int64", "uint8", "uint16",
-                         "uint32", "uint64"}:
-            try:
-                np_type = getattr(np, obj_cls)
-                real_value = np_type(obj["value"])
-            except AttributeError:
-                real_value = obj["value"]
-            return real_value
-        elif obj_cls == "complex":
-            parts = obj["value"]
-            return complex(parts[0], parts[1])
-        elif obj_cls == "range":
-            range_descr = obj["value"]
-            return range(range_descr[0], range_descr[1], range_descr[2])
+        elif obj_cls in VALUE_CLASSES:
+            if lazy_values and "json" in obj:
+                return obj
+            return value_obj_hook(obj)
 
     return obj
+
+
+def defer_array_payloads(obj_bytes):
+    """
+    Replace numeric payloads of ndarray values in JSON bytes with strings
+    holding the same JSON, e.g. {"_cls": "ndarray", "value": [1, 2]}
+    becomes {"_cls": "ndarray", "json": "[1,2]"}.
+
+    JSON loads() copies such a string as a whole, instead of making an
+    object for every number, and the string is compact and not tracked
+    by the garbage collector. Arrays with small or non-numeric payloads
+    (or with keys in another order) are left as they are and decoded
+    while loading.
+
+    Args:
+        obj_bytes(bytes): JSON bytes.
+    Returns:
+        bytes
+    """
+    return _ARRAY_PAYLOAD_RE.sub(_payload_to_string, obj_bytes)
+
+
+def _payload_to_string(match):
+    payload = match.group(3)
+    # Payload which isn't numeric is matched only up to some nested list.
+    if payload.count(b"[") != payload.count(b"]"):
+        return match.group(0)
+
+    return b"".join((match.group(1), b'"json"', match.group(2),
+                     b'"', payload.translate(None, b" \t\r\n"), b'"'))
+
+
+def new_property(name, value, lazy_values=False):
+    """
+    Make a property from its decoded JSON fields.
+
+    Args:
+        name(str): Property name.
+        value(object): Property value.
+        lazy_values(bool): Decode value (which may hold deferred array
+            payloads) on first access.
+    Returns:
+        Property
+    """
+    if lazy_values and isinstance(value, (dict, list)):
+        return Property(parent=None, name=name, value=value, decoder=decode_value)
+
+    return Property(parent=None, name=name, value=value)
+
+
+def value_obj_hook(obj: dict):
+    """
+    Make a value object (set, array, complex number...) from its JSON form.
+    Values nested in the provided object have to be already converted.
+
+    Args:
+        obj(dict): Dict object with "_cls" and "value" keys.
+    Returns:
+        Concrete value based on provided dictionary.
+    """
+    obj_cls = obj["_cls"]
+
+    if obj_cls == "set":
+        return set(obj["value"])
+    elif obj_cls == "ndarray":
+        if "json" in obj:
+            # Payload deferred by defer_array_payloads()
+            return np.array(json.loads(obj["json"]))
+        return np.array(obj["value"])
+    elif obj_cls in NP_INT_CLASSES:
+        try:
+            np_type = getattr(np, obj_cls)
+            real_value = np_type(obj["value"])
+        except AttributeError:
+            real_value = obj["value"]
+        return real_value
+    elif obj_cls == "complex":
+        parts = obj["value"]
+        return complex(parts[0], parts[1])
+    elif obj_cls == "range":
+        range_descr = obj["value"]
+        return range(range_descr[0], range_descr[1], range_descr[2])
+
+    return obj
+
+
+def decode_value(raw_value):
+    """
+    Convert a property value kept in decoded JSON form, the same way
+    JSON loads() with ``json_obj_hook`` would do.
+
+    Args:
+        raw_value(object): Value made of JSON types.
+    Returns:
+        Concrete value.
+    """
+    if isinstance(raw_value, list):
+        return [decode_value(item) for item in raw_value]
+    elif isinstance(raw_value, dict):
+        obj = {key: decode_value(item) for key, item in raw_value.items()}
+        if obj.get("_cls") in VALUE_CLASSES:
+            return value_obj_hook(obj)
+        return obj
+
+    return raw_value
@@ -0,0 +1,129 @@
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+from .model_deserializer import ConversionAbortedError
+
+
+class ConversionMonitor:
+    """
+    Reports progress of a (long) conversion and stops it cooperatively
+    when cancelled or when it runs out of its time or memory budget.
+
+    Deserializer and conversion call ``report()``/``count()`` as they go,
+    these also check the budgets and raise ``ConversionAbortedError``.
+    ``cancel()`` may be called from any thread.
+    """
+
+    def __init__(self, callback=None, time_budget=None, memory_budget=None, report_interval=10000):
+        """
+        Initialize an object, time budget starts running immediately.
+
+        Args:
+            callback(callable): Called as callback(stage, done, total) on
+                progress, total is None when it isn't known upfront.
+            time_budget(float): Allowed wall-clock duration in seconds.
+            memory_budget(int): Allowed resident memory of this process in
+                bytes, memory of worker processes isn't counted. Where
+                /proc isn't available the peak resident memory of the
+                process is checked instead.
+            report_interval(int): Number of counted items between two
+                progress reports.
+        """
+        if memory_budget is not None and resource is None:
+            raise ValueError("Memory budget is not supported on this platform.")
+
+        self.callback = callback
+        self.time_budget = time_budget
+        self.memory_budget = memory_budget
+        self.report_interval = report_interval
+
+        self._start_time = time.monotonic()
+        self._cancel_event = threading.Event()
+        self._counts = {}
+
+    def cancel(self):
+        """ Request the conversion to stop at its next progress check. """
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    @property
+    def elapsed_time(self):
+        return time.monotonic() - self._start_time
+
+    def check(self, stage=None):
+        """
+        Raise if the conversion has to be aborted.
+
+        Args:
+            stage(str): Stage the conversion is in.
+        Raises:
+            ConversionAbortedError
+        Returns:
+            None
+        """
+        if self._cancel_event.is_set():
+            raise ConversionAbortedError(ConversionAbortedError.CONVERSION_CANCELLED, stage=stage)
+
+        if self.time_budget is not None and self.elapsed_time > self.time_budget:
+            raise ConversionAbortedError(ConversionAbortedError.TIME_BUDGET_EXCEEDED, stage=stage,
+                                         detail="{0:.1f} s".format(self.time_budget))
+
+        if self.memory_budget is not None and _resident_memory() > self.memory_budget:
+            raise ConversionAbortedError(ConversionAbortedError.MEMORY_BUDGET_EXCEEDED, stage=stage,
+                                         detail="{0} bytes".format(self.memory_budget))
+
+    def report(self, stage, done, total=None):
+        """
+        Check budgets and report progress of the stage.
+
+        Args:
+            stage(str): Stage the conversion is in.
+            done(int): Amount of work done in the stage.
+            total(int): Total amount of work in the stage, if known.
+        Raises:
+            ConversionAbortedError
+        Returns:
+            None
+        """
+        self.check(stage)
+        if self.callback is not None:
+            self.callback(stage, done, total)
+
+    def count(self, stage, amount=1):
+        """
+        Count processed items of the stage, progress is reported once
+        per ``report_interval`` items.
+
+        Returns:
+            None
+        """
+        previous = self._counts.get(stage, 0)
+        done = self._counts[stage] = previous + amount
+        if done // self.report_interval != previous // self.report_interval:
+            self.report(stage, done)
+
+
+def _resident_memory():
+    """
+    Return current resident memory of this process in bytes, or the peak
+    one where /proc isn't available.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        pass
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
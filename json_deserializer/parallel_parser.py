@@ -0,0 +1,252 @@
+from concurrent.futures import ProcessPoolExecutor
+import functools as fn
+import gc
+import json
+import re
+
+import numpy as np
+
+from .constants import STAGE_DECODE
+from .model_deserializer import json_obj_hook
+
+# Arrays of each DevPartition which are decoded in worker processes.
+PARTITION_ARRAYS = (b"components", b"parent_components", b"nodes")
+
+# Approximate size of the JSON chunk handed to a single worker task.
+CHUNK_SIZE = 4 << 20
+
+# Matches object key right before the position it is searched up to.
+_KEY_RE = re.compile(rb'"([^"\\]*)"\s*:\s*$')
+_KEY_WINDOW = 256
+
+# Size of the blocks the raw bytes are scanned in, bounds the memory of
+# temporary arrays.
+SCAN_BLOCK_SIZE = 4 << 20
+
+_QUOTE, _BACKSLASH = b'"\\'
+_OPEN_OBJ, _OPEN_ARR, _CLOSE_OBJ, _CLOSE_ARR = b"{[}]"
+
+# Masking these bits maps all four brackets (and only "Y", "_", "y" and
+# DEL besides them) to the same value, which makes a cheap first filter.
+_BRACKET_BITS = 0xD9
+_BRACKET_MASKED = _OPEN_OBJ & _BRACKET_BITS
+
+# Lookup table of byte values, 1 for opening and -1 for closing brackets.
+_BRACKETS_KIND = np.zeros(256, dtype=np.int8)
+_BRACKETS_KIND[[_OPEN_OBJ, _OPEN_ARR]] = 1
+_BRACKETS_KIND[[_CLOSE_OBJ, _CLOSE_ARR]] = -1
+
+
+def locate_partition_arrays(obj_bytes):
+    """
+    Find element spans of ``PARTITION_ARRAYS`` of every DevPartition in
+    the raw JSON bytes of a model.
+
+    Structure is found with vectorized passes over blocks of the bytes
+    (strings are masked out using positions of unescaped quotes), only
+    brackets of the top levels of the document are visited one by one.
+
+    Args:
+        obj_bytes(bytes): JSON bytes.
+    Returns:
+        list with an item for each partition (in document order), each one
+        is a dict mapping array name to
+        (array_start, array_end, [(element_start, element_end), ...]),
+        where array positions point at brackets.
+    """
+    data = np.frombuffer(obj_bytes, dtype=np.uint8)
+    index_dtype = np.int32 if len(data) < 2 ** 31 else np.int64
+
+    quotes = []
+    backslashes = []
+    brackets = []
+    brackets_kind = []
+    for block_start in range(0, len(data), SCAN_BLOCK_SIZE):
+        block = data[block_start:block_start + SCAN_BLOCK_SIZE]
+        quotes.append((np.flatnonzero(block == _QUOTE) + block_start).astype(index_dtype))
+        backslashes.append((np.flatnonzero(block == _BACKSLASH) + block_start).astype(index_dtype))
+
+        candidates = np.flatnonzero((block & _BRACKET_BITS) == _BRACKET_MASKED)
+        kind = _BRACKETS_KIND[block[candidates]]
+        is_bracket = kind != 0
+        brackets.append((candidates[is_bracket] + block_start).astype(index_dtype))
+        brackets_kind.append(kind[is_bracket])
+
+    quotes = np.concatenate(quotes)
+    backslashes = np.concatenate(backslashes)
+    brackets = np.concatenate(brackets)
+    brackets_kind = np.concatenate(brackets_kind)
+
+    maybe_escaped = np.flatnonzero(data[np.maximum(quotes - 1, 0)] == _BACKSLASH)
+    if len(maybe_escaped):
+        # Quote is escaped if the run of backslashes before it is odd.
+        run_starts = np.ones(len(backslashes), dtype=bool)
+        run_starts[1:] = np.diff(backslashes) != 1
+        run_start_idx = np.maximum.accumulate(np.where(run_starts, np.arange(len(backslashes)), 0))
+
+        run_end_idx = np.searchsorted(backslashes, quotes[maybe_escaped] - 1)
+        run_length = run_end_idx - run_start_idx[run_end_idx] + 1
+        unescaped = np.ones(len(quotes), dtype=bool)
+        unescaped[maybe_escaped[run_length % 2 == 1]] = False
+        quotes = quotes[unescaped]
+
+    # Brackets preceded by an even number of quotes are outside strings.
+    outside = np.searchsorted(quotes, brackets) % 2 == 0
+    brackets = brackets[outside]
+    delta = brackets_kind[outside]
+
+    # Nesting level of the container each bracket opens or closes, the
+    # root is at 0 and elements of partition arrays are at 4.
+    levels = np.cumsum(delta, dtype=index_dtype) - (delta > 0)
+
+    partitions = []
+    # Each item is (bracket, key under which the container is in its parent).
+    stack = []
+    array_start = None
+
+    top = levels <= 3
+    for pos, level in zip(brackets[top].tolist(), levels[top].tolist()):
+        char = obj_bytes[pos]
+
+        if char == _OPEN_OBJ or char == _OPEN_ARR:
+            key = None
+            if level in (1, 3) and stack[-1][0] == _OPEN_OBJ:
+                match = _KEY_RE.search(obj_bytes, max(0, pos - _KEY_WINDOW), pos)
+                key = match.group(1) if match else None
+            stack.append((char, key))
+
+            if level == 2 and char == _OPEN_OBJ and stack[1][1] == b"dev_partitions":
+                partitions.append({})
+            elif level == 3 and char == _OPEN_ARR and stack[1][1] == b"dev_partitions" \
+                    and key in PARTITION_ARRAYS:
+                array_start = pos
+        else:
+            _, container_key = stack.pop()
+            if level == 3 and array_start is not None:
+                partitions[-1][container_key] = (array_start, pos, None)
+                array_start = None
+
+    # Element spans are objects directly inside the located arrays.
+    elements = brackets[levels == 4]
+    elements_char = data[elements]
+    for arrays in partitions:
+        for name, (array_start, array_end, _) in arrays.items():
+            first, last = np.searchsorted(elements, (array_start, array_end))
+            chars = elements_char[first:last]
+            starts = elements[first:last][chars == _OPEN_OBJ]
+            ends = elements[first:last][chars == _CLOSE_OBJ] + 1
+            arrays[name] = (array_start, array_end, list(zip(starts.tolist(), ends.tolist())))
+
+    return partitions
+
+
+def get_model_parallel(obj_bytes, workers=None, lazy_values=False, chunk_size=CHUNK_SIZE, monitor=None):
+    """
+    Reconstruct model graph from JSON bytes, building components and
+    nodes of the partitions in worker processes.
+
+    This process only scans the document structure, unpickles entities
+    made by workers and links them together, ids are resolved by
+    ``json_obj_hook`` the same way as in serial loading. That work takes
+    about 60% of the CPU time of serial loading, so the wall time gets
+    below the serial one only with enough free cores (and large
+    documents); on a single core this is slower than serial loading.
+
+    Args:
+        obj_bytes(bytes): JSON bytes.
+        workers(int): Number of worker processes (default is CPU count).
+        lazy_values(bool): See ``JSONDeserializer``.
+        chunk_size(int): Approximate size in bytes of a worker task.
+        monitor(ConversionMonitor): Gets progress, may abort decoding.
+    Returns:
+        Model, or None if the document has no partition arrays to split.
+    """
+    partitions = locate_partition_arrays(obj_bytes)
+    if not any(partitions):
+        return None
+
+    terminal_ids = {}
+    component_ids = {}
+    obj_hook = fn.partial(json_obj_hook, terminal_ids=terminal_ids, component_ids=component_ids,
+                          lazy_values=lazy_values, monitor=monitor)
+
+    # Skeleton is the document with emptied partition arrays.
+    skeleton = []
+    position = 0
+    for arrays in partitions:
+        for array_start, array_end, _ in sorted(arrays.values()):
+            skeleton.append(obj_bytes[position:array_start + 1])
+            position = array_end
+    skeleton.append(obj_bytes[position:])
+
+    gc_enabled = gc.isenabled()
+    try:
+        with ProcessPoolExecutor(workers) as executor:
+            tasks = []
+            for part_idx, arrays in enumerate(partitions):
+                for name, (_, _, elements) in arrays.items():
+                    for chunk in _split_elements(obj_bytes, elements, chunk_size):
+                        future = executor.submit(_decode_chunk, chunk, lazy_values)
+                        tasks.append((part_idx, name.decode(), future))
+
+            # Entities (and their ids) are collected as chunks arrive, in
+            # document order. Unpickling only allocates long-lived objects,
+            # so the garbage collector is kept off meanwhile.
+            gc.disable()
+            partition_entities = [{name.decode(): [] for name in arrays} for arrays in partitions]
+            try:
+                for part_idx, name, future in tasks:
+                    entities, chunk_terminal_ids, chunk_component_ids = future.result()
+                    partition_entities[part_idx][name].extend(entities)
+                    terminal_ids.update(chunk_terminal_ids)
+                    component_ids.update(chunk_component_ids)
+                    if monitor is not None:
+                        monitor.count(STAGE_DECODE, len(entities))
+            except BaseException:
+                # Don't wait for chunks which are not decoded yet
+                # (shutdown() can cancel them itself only from Python 3.9).
+                for _, _, pending in tasks:
+                    pending.cancel()
+                raise
+
+        part_entities = iter(partition_entities)
+
+        def skeleton_hook(obj):
+            if obj and obj.get("_cls") == "DevPartition":
+                obj.update(next(part_entities))
+            return obj_hook(obj)
+
+        return json.loads(b"".join(skeleton), object_hook=skeleton_hook)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _split_elements(obj_bytes, elements, chunk_size):
+    """ Yield JSON arrays made of consecutive elements, about chunk_size long each. """
+    first = 0
+    while first < len(elements):
+        chunk_start = elements[first][0]
+        last = first
+        while last + 1 < len(elements) and elements[last + 1][1] - chunk_start <= chunk_size:
+            last += 1
+        yield b"[" + obj_bytes[chunk_start:elements[last][1]] + b"]"
+        first = last + 1
+
+
+def _decode_chunk(chunk, lazy_values):
+    """
+    Decode JSON array of components or nodes into entities, with ids of
+    parent components and node terminals left unresolved.
+    Runs in a worker process.
+
+    Returns:
+        tuple (entities, terminal ids memo, component ids memo)
+    """
+    terminal_ids = {}
+    component_ids = {}
+    entities = json.loads(chunk, object_hook=fn.partial(json_obj_hook,
+                                                        terminal_ids=terminal_ids,
+                                                        component_ids=component_ids,
+                                                        lazy_values=lazy_values))
+    return entities, terminal_ids, component_ids
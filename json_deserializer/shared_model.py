@@ -0,0 +1,178 @@
+from multiprocessing import shared_memory
+import gc
+import pickle
+import struct
+
+from ..json_deserializer import Node, Terminal, Property, Component, ModelPartition
+from .model_deserializer import decode_value
+
+# Size prefix of the flat payload; shared memory blocks may be rounded up
+# to the page size, so the real payload length is stored explicitly.
+HEADER = struct.Struct("<Q")
+
+ROLE_COMPONENT = 0
+ROLE_PARENT_COMPONENT = 1
+ROLE_DETACHED = 2
+
+
+def flatten_partition(model_partition: ModelPartition):
+    """
+    Serialize a model partition into flat entity tables where all
+    cross references are replaced with table indices. Property values
+    which are not decoded yet (see ``JSONDeserializer`` lazy_values) are
+    stored as they are and decoded on first access after restoring;
+    property overlays are not taken into account.
+
+    Args:
+        model_partition(ModelPartition): Partition to serialize.
+    Returns:
+        bytes
+    """
+    comp_index = {}
+    components = []
+    properties = []
+    terminals = []
+    term_index = {}
+
+    def index_component(comp, role):
+        if comp in comp_index:
+            return comp_index[comp]
+        idx = comp_index[comp] = len(components)
+        components.append(None)
+
+        parent_comp = comp.parent_comp
+        if isinstance(parent_comp, Component):
+            parent_idx, parent_raw = index_component(parent_comp, ROLE_DETACHED), None
+        else:
+            parent_idx, parent_raw = -1, parent_comp
+        components[idx] = [comp.name, comp.comp_type, comp.composite, parent_idx, parent_raw, role]
+
+        for prop in comp.properties.values():
+            # Lazily loaded values are shipped undecoded, overlays are left out.
+            value, decoder = prop.raw_state()
+            properties.append((idx, prop.name, value, decoder is not None))
+        for term in comp.terminals.values():
+            term_index[term] = len(terminals)
+            terminals.append((idx, term.name, term.kind))
+        return idx
+
+    for role, comps in ((ROLE_PARENT_COMPONENT, model_partition.parent_components),
+                        (ROLE_COMPONENT, model_partition.components)):
+        for comp in comps:
+            idx = index_component(comp, role)
+            # Parent components may have been indexed earlier as detached.
+            components[idx][5] = role
+
+    nodes = []
+    for node in model_partition.nodes:
+        node_terms = []
+        for term in node.terminals:
+            if term not in term_index:
+                term_index[term] = len(terminals)
+                terminals.append((-1, term.name, term.kind))
+            node_terms.append(term_index[term])
+        nodes.append((node.name, node_terms, node.boundary))
+
+    tables = {
+        "name": model_partition.name,
+        "components": [tuple(comp) for comp in components],
+        "properties": properties,
+        "terminals": terminals,
+        "nodes": nodes,
+    }
+    return pickle.dumps(tables, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def restore_partition(data, freeze=False):
+    """
+    Rebuild a model partition from data made by ``flatten_partition``.
+
+    Args:
+        data(bytes-like): Flat serialized partition.
+        freeze(bool): Freeze the rebuilt partition.
+    Returns:
+        ModelPartition
+    """
+    # The rebuild only allocates long-lived objects, so running the cyclic
+    # garbage collector over the growing graph meanwhile is wasted work.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        model_partition = _restore_tables(pickle.loads(data))
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    if freeze:
+        model_partition.freeze()
+    return model_partition
+
+
+def _restore_tables(tables):
+    components = [Component(parent=None, name=name, comp_type=comp_type, composite=composite)
+                  for name, comp_type, composite, _, _, _ in tables["components"]]
+    for comp, (_, _, _, parent_idx, parent_raw, _) in zip(components, tables["components"]):
+        comp.parent_comp = components[parent_idx] if parent_idx >= 0 else parent_raw
+
+    for comp_idx, name, value, lazy in tables["properties"]:
+        components[comp_idx].add_property(
+            Property(parent=None, name=name, value=value, decoder=decode_value if lazy else None))
+
+    terminals = []
+    for comp_idx, name, kind in tables["terminals"]:
+        term = Terminal(parent=None, name=name, kind=kind)
+        if comp_idx >= 0:
+            components[comp_idx].add_terminal(term)
+        terminals.append(term)
+
+    nodes = []
+    for name, node_terms, boundary in tables["nodes"]:
+        node = Node(parent=None, name=name, boundary=boundary)
+        node.add_terminals(terminals[term_idx] for term_idx in node_terms)
+        nodes.append(node)
+
+    roles = [row[5] for row in tables["components"]]
+    return ModelPartition(
+        parent=None,
+        name=tables["name"],
+        parent_components=[c for c, r in zip(components, roles) if r == ROLE_PARENT_COMPONENT],
+        components=[c for c, r in zip(components, roles) if r == ROLE_COMPONENT],
+        nodes=nodes)
+
+
+def share_partition(model_partition: ModelPartition):
+    """
+    Place a flat copy of the model partition into shared memory.
+    The caller owns the returned block and is responsible for calling
+    ``close()`` and ``unlink()`` once all workers are done.
+
+    Args:
+        model_partition(ModelPartition): Partition to share.
+    Returns:
+        SharedMemory, pass its ``name`` to ``attach_partition`` in workers.
+    """
+    data = flatten_partition(model_partition)
+    shm = shared_memory.SharedMemory(create=True, size=HEADER.size + len(data))
+    HEADER.pack_into(shm.buf, 0, len(data))
+    shm.buf[HEADER.size:HEADER.size + len(data)] = data
+    return shm
+
+
+def attach_partition(shm_name, freeze=False):
+    """
+    Rebuild a model partition from a shared memory block created by
+    ``share_partition``, without re-parsing the JSON.
+
+    Args:
+        shm_name(str): Name of the shared memory block.
+        freeze(bool): Freeze the rebuilt partition.
+    Returns:
+        ModelPartition
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        size, = HEADER.unpack_from(shm.buf, 0)
+        with shm.buf[HEADER.size:HEADER.size + size] as data:
+            return restore_partition(data, freeze=freeze)
+    finally:
+        shm.close()
@@ -0,0 +1,78 @@
+from importlib import import_module
+import threading
+
+# Packages expose output format modules under this entry point group, e.g.
+#   entry_points={"tse2tpt.output_formats": ["opendss = tse2opendss"]}
+# The module has to provide convert() and generate_output_files().
+ENTRY_POINT_GROUP = "tse2tpt.output_formats"
+
+_lock = threading.RLock()
+# Format name -> entry point or module path, filled on first lookup.
+_sources = None
+# Format name -> imported module.
+_modules = {}
+
+
+def register_output_format(name, module_path):
+    """
+    Register output format module by its import path, in addition to
+    the ones discovered through entry points.
+    The module isn't imported until the format is requested.
+
+    Args:
+        name(str): Format name.
+        module_path(str): Absolute import path of the module.
+    Returns:
+        None
+    """
+    with _lock:
+        _discover()[name] = module_path
+        _modules.pop(name, None)
+
+
+def available_output_formats():
+    """ Return sorted names of all known output formats, without importing them. """
+    with _lock:
+        return sorted(_discover())
+
+
+def get_output_module(name):
+    """
+    Return output format module for the given format name, importing it
+    on first request.
+
+    Args:
+        name(str): Format name.
+    Raises:
+        ValueError exception if format is unknown.
+    Returns:
+        module
+    """
+    with _lock:
+        module = _modules.get(name)
+        if module is None:
+            try:
+                source = _discover()[name]
+            except KeyError:
+                raise ValueError("Unknown output format '{0}', available formats: {1}".format(
+                    name, ", ".join(sorted(_discover())) or "none"))
+
+            module = import_module(source) if isinstance(source, str) else source.load()
+            _modules[name] = module
+
+        return module
+
+
+def _discover():
+    global _sources
+    if _sources is None:
+        from importlib.metadata import entry_points
+
+        try:
+            group_entry_points = entry_points(group=ENTRY_POINT_GROUP)
+        except TypeError:
+            # Python < 3.10 returns a dict of all groups.
+            group_entry_points = entry_points().get(ENTRY_POINT_GROUP, ())
+
+        _sources = {ep.name: ep for ep in group_entry_points}
+    return _sources
@@ -5,6 +5,7 @@ setup(
     version='0.3.0',
     packages=find_packages(exclude=['tests', ]),
     install_requires=["typhoon-hil-api"],
+    python_requires=">=3.8",
     url='https://www.typhoon-hil.com/',
     include_package_data=True,
     license='MIT',
@@ -1,21 +1,106 @@
-from .json_deserializer import JSONDeserializer
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
 
-def load_json(json_file):
-    model_handle = JSONDeserializer(json_file)
+from .json_deserializer import JSONDeserializer, property_overlay
+from .json_deserializer.constants import STAGE_CONVERT, STAGE_GENERATE
+from .output_formats import get_output_module
+
+def load_json(json_file, monitor=None):
+    model_handle = JSONDeserializer(json_file, monitor=monitor)
     model_handle.load_bytes_from_file()
     model = model_handle.get_model().model_partitions.get("hil0")
     return model
 
-def start_conversion(input_json_path, output_format_module, simulation_parameters=None):
-    """ Convert the input JSON to the new format defined by output_format_module."""
+def start_conversion(input_json_path, output_format_module, simulation_parameters=None, subsystem=None,
+                     monitor=None):
+    """ Convert the input JSON to the new format defined by output_format_module.
+        output_format_module may also be a format name, its module is then looked up
+        (and imported on first use) through the output formats registry.
+        Only the parent component with FQN subsystem is converted, if provided.
+        The optional ConversionMonitor gets progress of all stages and may abort
+        the conversion between them with ConversionAbortedError."""
+
+    if isinstance(output_format_module, str):
+        output_format_module = get_output_module(output_format_module)
 
     # Deserialize the JSON file
-    tse_model = load_json(input_json_path)
+    tse_model = load_json(input_json_path, monitor)
+    if subsystem is not None:
+        tse_model = tse_model.extract_subsystem(parent_fqn=subsystem)
 
     # Convert the TSE model to the new format (import the function in the output module's __init__.py)
+    if monitor is not None:
+        monitor.report(STAGE_CONVERT, 0, 1)
     new_format = output_format_module.convert(tse_model, input_json_path, simulation_parameters)
 
     # Generate output files from the new format (import the function in the output module's __init__.py)
+    if monitor is not None:
+        monitor.report(STAGE_GENERATE, 0, 1)
     debug = output_format_module.generate_output_files(new_format)
+    if monitor is not None:
+        monitor.report(STAGE_GENERATE, 1, 1)
 
     return debug
+
+
+def start_sweep(input_json_path, output_format_module, variants, max_workers=1, subsystem=None,
+                monitor=None):
+    """ Convert the input JSON once per variant, deserializing it only once.
+        Each variant is a dict with optional keys:
+            simulation_parameters - passed to output_format_module.convert()
+            property_values - {component FQN: {property name: value}} overriding
+                property values of the model (components and parent components)
+                for this variant only, ValueError is raised for unknown ones
+        Variants share one frozen model, property values are overridden (and any
+        property assignments done by the output module are kept) in a per-variant
+        copy-on-write overlay. Output modules which change model topology can't be
+        used in sweeps, they get FrozenEntityError.
+        With max_workers > 1 variants are converted in parallel threads, which run
+        in copies of the caller's context, so overlays active around the sweep apply
+        in both cases.
+        Returns list of generate_output_files() results in order of variants."""
+
+    if isinstance(output_format_module, str):
+        output_format_module = get_output_module(output_format_module)
+
+    # Deserialize the JSON file
+    tse_model = load_json(input_json_path, monitor)
+    if subsystem is not None:
+        tse_model = tse_model.extract_subsystem(parent_fqn=subsystem)
+    tse_model.freeze()
+
+    variants = list(variants)
+    components = dict(tse_model.components_by_fqn)
+    components.update((comp.fqn, comp) for comp in tse_model.parent_components)
+
+    # Resolve overridden properties upfront, so typos fail before any conversion
+    overlays = []
+    for variant_idx, variant in enumerate(variants):
+        overlay = {}
+        for comp_fqn, comp_values in variant.get("property_values", {}).items():
+            comp = components.get(comp_fqn)
+            if comp is None:
+                raise ValueError("Variant {0}: unknown component '{1}'".format(variant_idx, comp_fqn))
+            comp_properties = comp.properties
+            for prop_name, value in comp_values.items():
+                if prop_name not in comp_properties:
+                    raise ValueError("Variant {0}: component '{1}' has no property '{2}'".format(
+                        variant_idx, comp_fqn, prop_name))
+                overlay[comp_properties[prop_name]] = value
+        overlays.append(overlay)
+
+    def convert_variant(variant_idx):
+        if monitor is not None:
+            monitor.report(STAGE_CONVERT, variant_idx, len(variants))
+        with property_overlay(overlays[variant_idx]):
+            new_format = output_format_module.convert(tse_model, input_json_path,
+                                                      variants[variant_idx].get("simulation_parameters"))
+            return output_format_module.generate_output_files(new_format)
+
+    if max_workers == 1:
+        return [convert_variant(variant_idx) for variant_idx in range(len(variants))]
+
+    with ThreadPoolExecutor(max_workers) as executor:
+        futures = [executor.submit(contextvars.copy_context().run, convert_variant, variant_idx)
+                   for variant_idx in range(len(variants))]
+        return [future.result() for future in futures]